@@ -3,70 +3,134 @@
 File Sorter TUI - A text-based user interface for sorting files into appropriate folders.
 """
 
+import errno
 import os
 import shutil
-import mimetypes
 from pathlib import Path
-import string
-from typing import Dict, List, Optional, Tuple
+import sys
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 
+from rich.markup import escape
+from textual import work
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical
 from textual.widgets import Button, DirectoryTree, Footer, Header, Static, Label, ProgressBar, Select
 from textual.binding import Binding
 from textual.screen import Screen
 
+if sys.platform == "win32":
+    import ctypes
+    kernel32 = ctypes.windll.kernel32
+    SEM_FAILCRITICALERRORS = 0x0001
+else:
+    kernel32 = None
+
 
 class FileCategory:
     """Class to define file categories and their associated extensions."""
     
     CATEGORIES = {
-        "Documents": [".pdf", ".docx", ".doc", ".txt", ".rtf", ".odt", ".xls", ".xlsx", ".ppt", ".pptx", ".csv", 
-                     ".md", ".markdown", ".tex", ".log", ".pages", ".numbers", ".key", ".odp", ".ods", ".epub", 
-                     ".djvu", ".mobi", ".azw", ".azw3", ".fb2", ".oxps", ".xps"],
-        "Images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg", ".tiff", ".webp", ".ico", ".psd", ".ai", 
-                  ".eps", ".indd", ".raw", ".cr2", ".nef", ".orf", ".sr2", ".heif", ".heic", ".xcf", ".cdr"],
-        "Videos": [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpg", ".mpeg", ".3gp", 
-                  ".3g2", ".ogv", ".vob", ".swf", ".m2ts", ".mts", ".ts", ".divx", ".f4v", ".rm", ".rmvb", ".ogm"],
-        "Audio": [".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".opus", ".aiff", ".alac", ".ape", 
-                 ".mid", ".midi", ".amr", ".ac3", ".dts", ".ra", ".voc", ".pcm", ".dsf", ".dff", ".mka", ".au"],
-        "Archives": [".zip", ".rar", ".tar", ".gz", ".7z", ".bz2", ".xz", ".iso", ".tgz", ".tbz2", ".txz", 
-                    ".cab", ".deb", ".rpm", ".pkg", ".dmg", ".z", ".lzma", ".lz", ".lz4", ".lzo", ".zst", ".arj"],
-        "Code": [".py", ".js", ".html", ".css", ".java", ".cpp", ".c", ".h", ".php", ".rb", ".go", ".rs", ".ts", 
-                ".swift", ".kt", ".kts", ".scala", ".sc", ".dart", ".lua", ".pl", ".pm", ".sh", ".bash", ".ps1", 
-                ".bat", ".cmd", ".sql", ".r", ".jsx", ".tsx", ".vue", ".elm", ".clj", ".ex", ".exs", ".erl", ".hrl", 
-                ".hs", ".lhs", ".fs", ".fsx", ".ml", ".mli", ".groovy", ".cs", ".vb", ".xaml", ".xml", ".json", 
-                ".yaml", ".yml", ".toml", ".ini", ".config", ".cmake", ".make", ".gradle", ".m", ".mm", ".f", 
-                ".f90", ".f95", ".f03", ".f08", ".asm", ".s", ".gitignore", ".dockerignore", ".editorconfig"],
-        "Executables": [".exe", ".msi", ".app", ".dmg", ".deb", ".rpm", ".apk", ".jar", ".war", ".dll", ".so", 
-                       ".dylib", ".bin", ".run", ".bat", ".cmd", ".com", ".gadget", ".vb", ".vbs", ".ps1", ".msc"],
-        "Fonts": [".ttf", ".otf", ".woff", ".woff2", ".eot", ".fnt", ".fon", ".bdf", ".pfb", ".pfm", ".afm", ".pfa"],
-        "Spreadsheets": [".xlsx", ".xls", ".xlsm", ".xlsb", ".numbers", ".ods", ".csv", ".tsv", ".dif", ".sylk", ".dbf"],
-        "Presentations": [".pptx", ".ppt", ".pps", ".ppsx", ".odp", ".key", ".gslides"],
-        "Databases": [".db", ".sqlite", ".sqlite3", ".mdb", ".accdb", ".sql", ".bak", ".dbf", ".frm", ".ibd", ".myd", ".myi"],
-        "3D_Models": [".obj", ".fbx", ".3ds", ".stl", ".dae", ".blend", ".max", ".ma", ".mb", ".c4d", ".lwo", ".lws"],
-        "CAD": [".dwg", ".dxf", ".step", ".stp", ".iges", ".igs", ".x_t", ".x_b", ".sldprt", ".sldasm", ".ipt", ".iam"],
-        "Vector": [".svg", ".ai", ".eps", ".pdf", ".cdr", ".afdesign", ".sketch"],
-        "Ebooks": [".epub", ".mobi", ".azw", ".azw3", ".fb2", ".ibooks", ".cbr", ".cbz", ".pdf"],
-        "Others": []  # Catch-all for other file types
-    }
-    
-    @classmethod
-    def get_category(cls, file_path: Path) -> str:
+        "Documents": frozenset({".pdf", ".docx", ".doc", ".txt", ".rtf", ".odt", ".xls", ".xlsx", ".ppt", ".pptx", ".csv", 
+                               ".md", ".markdown", ".tex", ".log", ".pages", ".numbers", ".key", ".odp", ".ods", ".epub", 
+                               ".djvu", ".mobi", ".azw", ".azw3", ".fb2", ".oxps", ".xps"}),
+        "Images": frozenset({".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg", ".tiff", ".webp", ".ico", ".psd", ".ai", 
+                            ".eps", ".indd", ".raw", ".cr2", ".nef", ".orf", ".sr2", ".heif", ".heic", ".xcf", ".cdr"}),
+        "Videos": frozenset({".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm", ".m4v", ".mpg", ".mpeg", ".3gp", 
+                            ".3g2", ".ogv", ".vob", ".swf", ".m2ts", ".mts", ".ts", ".divx", ".f4v", ".rm", ".rmvb", ".ogm"}),
+        "Audio": frozenset({".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".opus", ".aiff", ".alac", ".ape", 
+                           ".mid", ".midi", ".amr", ".ac3", ".dts", ".ra", ".voc", ".pcm", ".dsf", ".dff", ".mka", ".au"}),
+        "Archives": frozenset({".zip", ".rar", ".tar", ".gz", ".7z", ".bz2", ".xz", ".iso", ".tgz", ".tbz2", ".txz", 
+                              ".cab", ".deb", ".rpm", ".pkg", ".dmg", ".z", ".lzma", ".lz", ".lz4", ".lzo", ".zst", ".arj"}),
+        "Code": frozenset({".py", ".js", ".html", ".css", ".java", ".cpp", ".c", ".h", ".php", ".rb", ".go", ".rs", ".ts", 
+                          ".swift", ".kt", ".kts", ".scala", ".sc", ".dart", ".lua", ".pl", ".pm", ".sh", ".bash", ".ps1", 
+                          ".bat", ".cmd", ".sql", ".r", ".jsx", ".tsx", ".vue", ".elm", ".clj", ".ex", ".exs", ".erl", ".hrl", 
+                          ".hs", ".lhs", ".fs", ".fsx", ".ml", ".mli", ".groovy", ".cs", ".vb", ".xaml", ".xml", ".json", 
+                          ".yaml", ".yml", ".toml", ".ini", ".config", ".cmake", ".make", ".gradle", ".m", ".mm", ".f", 
+                          ".f90", ".f95", ".f03", ".f08", ".asm", ".s", ".gitignore", ".dockerignore", ".editorconfig"}),
+        "Executables": frozenset({".exe", ".msi", ".app", ".dmg", ".deb", ".rpm", ".apk", ".jar", ".war", ".dll", ".so", 
+                                 ".dylib", ".bin", ".run", ".bat", ".cmd", ".com", ".gadget", ".vb", ".vbs", ".ps1", ".msc"}),
+        "Fonts": frozenset({".ttf", ".otf", ".woff", ".woff2", ".eot", ".fnt", ".fon", ".bdf", ".pfb", ".pfm", ".afm", ".pfa"}),
+        "Spreadsheets": frozenset({".xlsx", ".xls", ".xlsm", ".xlsb", ".numbers", ".ods", ".csv", ".tsv", ".dif", ".sylk", ".dbf"}),
+        "Presentations": frozenset({".pptx", ".ppt", ".pps", ".ppsx", ".odp", ".key", ".gslides"}),
+        "Databases": frozenset({".db", ".sqlite", ".sqlite3", ".mdb", ".accdb", ".sql", ".bak", ".dbf", ".frm", ".ibd", ".myd", ".myi"}),
+        "3D_Models": frozenset({".obj", ".fbx", ".3ds", ".stl", ".dae", ".blend", ".max", ".ma", ".mb", ".c4d", ".lwo", ".lws"}),
+        "CAD": frozenset({".dwg", ".dxf", ".step", ".stp", ".iges", ".igs", ".x_t", ".x_b", ".sldprt", ".sldasm", ".ipt", ".iam"}),
+        "Vector": frozenset({".svg", ".ai", ".eps", ".pdf", ".cdr", ".afdesign", ".sketch"}),
+        "Ebooks": frozenset({".epub", ".mobi", ".azw", ".azw3", ".fb2", ".ibooks", ".cbr", ".cbz", ".pdf"}),
+        "Others": frozenset()  # Catch-all for other file types
+    }
+
+    @staticmethod
+    def get_category(file_path: Path) -> str:
         """Determine the category of a file based on its extension."""
-        extension = file_path.suffix.lower()
-        
-        for category, extensions in cls.CATEGORIES.items():
-            if extension in extensions:
-                return category
-        
-        return "Others"
+        return get_category(file_path.suffix.lower())
+
+
+# Flat extension -> category lookup built once at import. Iterating in reverse
+# lets earlier categories overwrite later ones, so the first listed category wins.
+_EXT_TO_CATEGORY: Dict[str, str] = {
+    extension: category
+    for category, extensions in reversed(FileCategory.CATEGORIES.items())
+    for extension in extensions
+}
+
+
+def get_category(suffix: str) -> str:
+    """Determine the category for a lowercased file extension such as ".pdf"."""
+    return _EXT_TO_CATEGORY.get(suffix, "Others")
+
+
+def rename_without_replace(source: str, destination: str) -> None:
+    """Rename a file, raising FileExistsError if the destination is taken."""
+    if sys.platform == "win32":
+        # Windows refuses to rename onto an existing file
+        os.rename(source, destination)
+        return
+    
+    # POSIX rename silently replaces the destination, but link() fails if it exists
+    try:
+        os.link(source, destination)
+    except OSError as e:
+        if e.errno in (errno.EEXIST, errno.EXDEV):
+            raise
+        # Filesystem without hard links (e.g. FAT): check, then rename
+        if os.path.lexists(destination):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), destination)
+        os.rename(source, destination)
+        return
+    
+    try:
+        os.unlink(source)
+    except OSError:
+        os.unlink(destination)
+        raise
+
+
+def move_file(source: str, destination: str, overwrite: bool = False) -> None:
+    """Move a file, using a plain rename unless it crosses filesystems.
+    
+    An existing destination raises FileExistsError unless overwrite is set.
+    """
+    try:
+        if overwrite:
+            os.replace(source, destination)
+        else:
+            rename_without_replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        if not overwrite and os.path.lexists(destination):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), destination)
+        shutil.move(source, destination)
 
 
 class SortingResults(Screen):
     """Screen to display sorting results."""
     
-    def __init__(self, results: Dict[str, List[Path]]):
+    def __init__(self, results: Dict[str, List[str]]):
         super().__init__()
         self.results = results
     
@@ -84,14 +148,18 @@ class SortingResults(Screen):
             total_files = sum(len(files) for files in self.results.values())
             yield Label(f"Total files sorted: {total_files}", classes="results-summary")
             
+            # Render every category into one Static instead of a Label per line,
+            # so the screen mounts a single widget however many files were sorted
+            lines = []
             for category, files in self.results.items():
                 if files:
-                    with Container(classes="category-container"):
-                        yield Label(f"{category} ({len(files)})", classes="category-title")
-                        for file in files[:5]:  # Show only first 5 files to avoid clutter
-                            yield Label(f"  • {file.name}", classes="file-item")
-                        if len(files) > 5:
-                            yield Label(f"  • ... and {len(files) - 5} more", classes="file-item-more")
+                    lines.append(f"[b]{category} ({len(files)})[/b]")
+                    for file in files[:5]:  # Show only first 5 files to avoid clutter
+                        lines.append(f"  • {escape(file)}")
+                    if len(files) > 5:
+                        lines.append(f"  [i]• ... and {len(files) - 5} more[/i]")
+                    lines.append("")
+            yield Static("\n".join(lines).rstrip(), id="results-list")
             
         with Horizontal(id="button-row"):
             yield Button("Back to Main", id="back-button", variant="primary")
@@ -285,26 +353,12 @@ class FileOrganizerPro(App):
         color: $text;
     }
     
-    .category-container {
-        margin-bottom: 1;
+    #results-list {
         border: panel $primary-background;
         padding: 0 1;
-    }
-    
-    .category-title {
-        color: $primary;
-        text-style: bold;
-    }
-    
-    .file-item {
         color: $text;
     }
     
-    .file-item-more {
-        color: $text-muted;
-        text-style: italic;
-    }
-    
     #button-row {
         height: 3;
         align: center middle;
@@ -332,9 +386,11 @@ class FileOrganizerPro(App):
     def __init__(self):
         super().__init__()
         self.selected_directory: Optional[Path] = None
-        self.last_sort_results: Dict[str, List[Path]] = {}
-        self.undo_data: Dict[Path, Path] = {}  # Original path -> New path
+        self.last_sort_results: Dict[str, List[str]] = defaultdict(list)  # Category -> sorted file names
+        self.undo_data: List[Tuple[str, str]] = []  # (New path, original path) pairs
         self.current_root: str = "/"  # Start at root directory
+        self.operation_lock = threading.Lock()  # Held while a sort or undo runs
+        self.available_drives: Optional[List[Tuple[str, str]]] = None  # Cached drive list
         
     def compose(self) -> ComposeResult:
         """Compose the application layout."""
@@ -371,41 +427,54 @@ class FileOrganizerPro(App):
     
     def get_available_drives(self) -> List[Tuple[str, str]]:
         """Get available drives on Windows for the Select widget."""
+        if self.available_drives is not None:
+            return self.available_drives
+        
         drives = []
         
         # Add Windows drives
-        for letter in string.ascii_uppercase:
-            drive = f"{letter}:\\"
-            if os.path.exists(drive):
-                try:
-                    import ctypes
-                    kernel32 = ctypes.windll.kernel32
-                    volumeNameBuffer = ctypes.create_unicode_buffer(1024)
-                    fileSystemNameBuffer = ctypes.create_unicode_buffer(1024)
-                    
-                    rc = kernel32.GetVolumeInformationW(
-                        ctypes.c_wchar_p(drive),
-                        volumeNameBuffer,
-                        ctypes.sizeof(volumeNameBuffer),
-                        None,  # serial number
-                        None,  # max component length
-                        None,  # file system flags
-                        fileSystemNameBuffer,
-                        ctypes.sizeof(fileSystemNameBuffer)
-                    )
-                    
-                    if rc != 0 and volumeNameBuffer.value:
-                        # Format with more space and clear labeling
-                        drives.append((drive, f"{letter}: - {volumeNameBuffer.value}"))
-                    else:
+        if kernel32 is not None:
+            # One call returns every mounted drive root as a NUL-separated list
+            drive_strings = ctypes.create_unicode_buffer(256)
+            length = kernel32.GetLogicalDriveStringsW(len(drive_strings), drive_strings)
+            
+            volumeNameBuffer = ctypes.create_unicode_buffer(1024)
+            fileSystemNameBuffer = ctypes.create_unicode_buffer(1024)
+            
+            # Don't pop up "no disk in drive" dialogs for empty removable drives
+            previous_error_mode = kernel32.SetErrorMode(SEM_FAILCRITICALERRORS)
+            try:
+                for drive in drive_strings[:length].split("\0"):
+                    if not drive:
+                        continue
+                    letter = drive[0]
+                    try:
+                        volumeNameBuffer.value = ""
+                        fileSystemNameBuffer.value = ""
+                        
+                        rc = kernel32.GetVolumeInformationW(
+                            ctypes.c_wchar_p(drive),
+                            volumeNameBuffer,
+                            len(volumeNameBuffer),
+                            None,  # serial number
+                            None,  # max component length
+                            None,  # file system flags
+                            fileSystemNameBuffer,
+                            len(fileSystemNameBuffer)
+                        )
+                        
+                        if rc != 0 and volumeNameBuffer.value:
+                            # Format with more space and clear labeling
+                            drives.append((drive, f"{letter}: - {volumeNameBuffer.value}"))
+                        else:
+                            drives.append((drive, f"{letter}:"))
+                    except Exception as e:
+                        # Fall back to simple label if there's an error
                         drives.append((drive, f"{letter}:"))
-                except Exception as e:
-                    # Fall back to simple label if there's an error
-                    drives.append((drive, f"{letter}:"))
-        
-        # Log the drives found for debugging
-        print(f"Available drives: {drives}")
+            finally:
+                kernel32.SetErrorMode(previous_error_mode)
         
+        self.available_drives = drives
         return drives
     
     def on_mount(self) -> None:
@@ -449,89 +518,141 @@ class FileOrganizerPro(App):
         except Exception as e:
             self.update_status(f"Error changing directory: {str(e)}")
     
+    @work(thread=True, group="file-operation")
     def action_sort(self) -> None:
-        """Sort files in the selected directory."""
-        if not self.selected_directory:
-            self.update_status("No directory selected. Please select a directory first.")
+        """Sort files in the selected directory in a background thread."""
+        if not self.operation_lock.acquire(blocking=False):
+            self.call_from_thread(self.update_status, "Another operation is already in progress.")
+            return
+        try:
+            self.sort_selected_directory()
+        finally:
+            self.operation_lock.release()
+    
+    def sort_selected_directory(self) -> None:
+        """Sort files in the selected directory, marshalling UI updates to the app thread."""
+        # Read the selection once; the UI stays live during the sort, so the
+        # user may pick another directory while this worker is running
+        directory = self.selected_directory
+        if not directory:
+            self.call_from_thread(self.update_status, "No directory selected. Please select a directory first.")
             return
         
-        self.update_status(f"Sorting files in {self.selected_directory}...")
-        progress_bar = self.query_one("#sort-progress")
-        progress_bar.display = True
+        self.call_from_thread(self.update_status, f"Sorting files in {directory}...")
+        self.call_from_thread(self.set_progress_visible, True)
         
         # Get all files in the selected directory (non-recursive)
-        files = [f for f in self.selected_directory.iterdir() if f.is_file()]
+        # scandir reuses the type information from the directory read, so no
+        # extra stat call is needed per entry
+        with os.scandir(directory) as entries:
+            files = [entry for entry in entries if entry.is_file(follow_symlinks=False)]
         
         if not files:
-            self.update_status("No files found in the selected directory.")
-            progress_bar.display = False
+            self.call_from_thread(self.update_status, "No files found in the selected directory.")
+            self.call_from_thread(self.set_progress_visible, False)
             return
         
-        # Reset results and undo data
-        self.last_sort_results = {category: [] for category in FileCategory.CATEGORIES.keys()}
-        self.undo_data = {}
+        # The previous results are about to be replaced, so stop the results and
+        # undo buttons from reading them until this run publishes its own.
+        # Results are built locally and only handed to the app thread at the end
+        self.call_from_thread(self.set_result_buttons_enabled, False)
+        sort_results: Dict[str, List[str]] = defaultdict(list)
+        undo_data: List[Tuple[str, str]] = []
         
-        # First pass: categorize files without moving them
-        files_by_category = {}
-        for file_path in files:
-            category = FileCategory.get_category(file_path)
-            if category not in files_by_category:
-                files_by_category[category] = []
-            files_by_category[category].append(file_path)
-        
-        # Second pass: create only needed directories and move files
-        total_files = len(files)
         processed_files = 0
-        
-        for category, category_files in files_by_category.items():
-            if not category_files:
-                continue  # Skip if no files for this category
+        last_progress = -1
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Single pass: categorize each file, create its category directory
+            # on first use and pick a free name. Names are resolved on this
+            # thread, so concurrent moves never collide
+            existing_by_dir: Dict[str, Set[str]] = {}
+            failed_categories: Set[str] = set()
+            moves = []
+            base_dir = str(directory)  # Plain strings keep Path objects out of the loop
+            lookup_category = get_category  # Local name avoids a global lookup per file
+            for entry in files:
+                name = entry.name
+                suffix = os.path.splitext(name)[1]
+                category = lookup_category(suffix.lower())
+                category_dir = os.path.join(base_dir, category)
                 
-            # Create category directory only if it has files
-            category_dir = self.selected_directory / category
-            if not category_dir.exists():
-                category_dir.mkdir(exist_ok=True)
-            
-            # Move files for this category
-            for file_path in category_files:
-                # Skip if file is already in its category directory
-                if file_path.parent == category_dir:
+                # Create the category directory on first use and remember the
+                # names already in it, so conflicts resolve in memory. Names are
+                # case-folded because NTFS and APFS treat "A.pdf" and "a.pdf" as
+                # the same file
+                if category in failed_categories:
                     continue
-                
-                # Create a new path for the file
-                new_path = category_dir / file_path.name
+                existing = existing_by_dir.get(category)
+                if existing is None:
+                    try:
+                        try:
+                            os.mkdir(category_dir)
+                            existing = set()
+                        except FileExistsError:
+                            existing = {existing_name.casefold() for existing_name in os.listdir(category_dir)}
+                    except OSError as e:
+                        # e.g. a plain file named like the category is in the way;
+                        # skip this category and keep sorting the others
+                        failed_categories.add(category)
+                        self.call_from_thread(self.update_status, f"Error preparing {category} folder: {str(e)}")
+                        continue
+                    existing_by_dir[category] = existing
                 
                 # Handle filename conflicts
-                counter = 1
-                original_stem = file_path.stem
-                while new_path.exists():
-                    new_stem = f"{original_stem}_{counter}"
-                    new_path = category_dir / f"{new_stem}{file_path.suffix}"
-                    counter += 1
+                candidate = name
+                if candidate.casefold() in existing:
+                    counter = 1
+                    original_stem = name[:len(name) - len(suffix)]
+                    while f"{original_stem}_{counter}{suffix}".casefold() in existing:
+                        counter += 1
+                    candidate = f"{original_stem}_{counter}{suffix}"
+                existing.add(candidate.casefold())
                 
-                # Move the file
+                moves.append((category, candidate, entry.path, name, os.path.join(category_dir, candidate)))
+            
+            # Queue the moves grouped by destination directory (in CATEGORIES
+            # order), then by name, so each directory's metadata stays hot
+            # while it is being filled
+            category_order = {category: index for index, category in enumerate(FileCategory.CATEGORIES)}
+            moves.sort(key=lambda move: (category_order[move[0]], move[1]))
+            total_files = len(moves)
+            futures = {
+                executor.submit(move_file, path, new_path): (category, candidate, path, name, new_path)
+                for category, candidate, path, name, new_path in moves
+            }
+            
+            # Results are collected in submission order, so the results screen
+            # lists categories and files the same way on every run
+            for future, (category, candidate, path, name, new_path) in futures.items():
                 try:
-                    shutil.move(str(file_path), str(new_path))
-                    self.last_sort_results[category].append(new_path)
-                    self.undo_data[new_path] = file_path
+                    future.result()
+                    sort_results[category].append(candidate)
+                    undo_data.append((new_path, path))
                 except Exception as e:
-                    self.update_status(f"Error moving {file_path.name}: {str(e)}")
+                    self.call_from_thread(self.update_status, f"Error moving {name}: {str(e)}")
                 
-                # Update progress
+                # Update progress only when the percentage actually changes
                 processed_files += 1
                 progress = int(processed_files / total_files * 100)
-                progress_bar.update(progress=progress)
+                if progress != last_progress:
+                    self.call_from_thread(self.update_progress, progress)
+                    last_progress = progress
         
-        # Enable results and undo buttons
-        self.query_one("#results-button").disabled = False
-        self.query_one("#undo-button").disabled = False
+        # Publish the results and enable results and undo buttons
+        self.call_from_thread(self.set_sort_results, sort_results, undo_data)
+        self.call_from_thread(self.set_result_buttons_enabled, True)
         
         # Update status
-        total_sorted = sum(len(files) for files in self.last_sort_results.values())
-        self.update_status(f"Sorting complete. {total_sorted} files sorted into categories.")
+        total_sorted = sum(len(files) for files in sort_results.values())
+        status_message = f"Sorting complete. {total_sorted} files sorted into categories."
+        if failed_categories:
+            status_message += f" Skipped folders that could not be prepared: {', '.join(sorted(failed_categories))}."
+        self.call_from_thread(self.update_status, status_message)
         
         # Refresh the directory tree
-        self.action_refresh()
+        self.call_from_thread(self.action_refresh)
     
     def show_results(self) -> None:
         """Show the results of the last sort operation."""
@@ -541,60 +662,71 @@ class FileOrganizerPro(App):
         
         self.push_screen(SortingResults(self.last_sort_results))
     
+    @work(thread=True, group="file-operation")
     def undo_sort(self) -> None:
-        """Undo the last sort operation."""
-        if not self.undo_data:
-            self.update_status("Nothing to undo.")
+        """Undo the last sort operation in a background thread."""
+        if not self.operation_lock.acquire(blocking=False):
+            self.call_from_thread(self.update_status, "Another operation is already in progress.")
+            return
+        try:
+            self.restore_last_sort()
+        finally:
+            self.operation_lock.release()
+    
+    def restore_last_sort(self) -> None:
+        """Move sorted files back, marshalling UI updates to the app thread."""
+        undo_data = self.undo_data
+        if not undo_data:
+            self.call_from_thread(self.update_status, "Nothing to undo.")
             return
         
-        self.update_status("Undoing last sort operation...")
-        progress_bar = self.query_one("#sort-progress")
-        progress_bar.display = True
+        self.call_from_thread(self.set_result_buttons_enabled, False)
+        self.call_from_thread(self.update_status, "Undoing last sort operation...")
+        self.call_from_thread(self.set_progress_visible, True)
         
         # Track category directories to check if they're empty after moving files
-        category_dirs = set()
+        category_dirs: Set[str] = set()
         
-        total_files = len(self.undo_data)
-        for i, (new_path, original_path) in enumerate(self.undo_data.items()):
+        total_files = len(undo_data)
+        last_progress = -1
+        for i, (new_path, original_path) in enumerate(undo_data):
             try:
-                if new_path.exists():
+                if os.path.exists(new_path):
                     # Store the parent directory to check if it's empty later
-                    category_dirs.add(new_path.parent)
+                    category_dirs.add(os.path.dirname(new_path))
                     
                     # Move the file back to its original location
-                    shutil.move(str(new_path), str(original_path))
+                    move_file(new_path, original_path, overwrite=True)
             except Exception as e:
-                self.update_status(f"Error undoing move for {new_path.name}: {str(e)}")
+                self.call_from_thread(self.update_status, f"Error undoing move for {os.path.basename(new_path)}: {str(e)}")
             
-            # Update progress
+            # Update progress only when the percentage actually changes
             progress = int((i + 1) / total_files * 100)
-            progress_bar.update(progress=progress)
+            if progress != last_progress:
+                self.call_from_thread(self.update_progress, progress)
+                last_progress = progress
         
         # Remove empty category directories
         removed_dirs = 0
         for directory in category_dirs:
+            # Just try the rmdir; it fails cheaply when the directory still has files
             try:
-                # Check if directory exists and is empty
-                if directory.exists() and not any(directory.iterdir()):
-                    directory.rmdir()
-                    removed_dirs += 1
-            except Exception as e:
-                self.update_status(f"Error removing directory {directory.name}: {str(e)}")
+                os.rmdir(directory)
+            except OSError as e:
+                if e.errno not in (errno.ENOTEMPTY, errno.EEXIST, errno.ENOENT):
+                    self.call_from_thread(self.update_status, f"Error removing directory {os.path.basename(directory)}: {str(e)}")
+            else:
+                removed_dirs += 1
         
         status_message = "Undo complete. Files restored to their original locations."
         if removed_dirs > 0:
             status_message += f" Removed {removed_dirs} empty directories."
         
-        self.update_status(status_message)
-        self.undo_data = {}
-        self.last_sort_results = {}
-        
-        # Disable results and undo buttons
-        self.query_one("#results-button").disabled = True
-        self.query_one("#undo-button").disabled = True
+        self.call_from_thread(self.update_status, status_message)
+        self.call_from_thread(self.set_sort_results, defaultdict(list), [])
         
         # Refresh the directory tree
-        self.action_refresh()
+        self.call_from_thread(self.action_refresh)
     
     def action_refresh(self) -> None:
         """Refresh the directory tree."""
@@ -604,12 +736,30 @@ class FileOrganizerPro(App):
     def update_status(self, message: str) -> None:
         """Update the status message."""
         self.query_one("#status-text").update(message)
+    
+    def update_progress(self, progress: int) -> None:
+        """Update the sort progress bar."""
+        self.query_one("#sort-progress").update(progress=progress)
+    
+    def set_progress_visible(self, visible: bool) -> None:
+        """Show the progress bar reset to zero, or hide it."""
+        progress_bar = self.query_one("#sort-progress")
+        if visible:
+            progress_bar.update(progress=0)
+        progress_bar.display = visible
+    
+    def set_sort_results(self, results: Dict[str, List[str]], undo_data: List[Tuple[str, str]]) -> None:
+        """Replace the last sort results and undo data (called on the app thread)."""
+        self.last_sort_results = results
+        self.undo_data = undo_data
+    
+    def set_result_buttons_enabled(self, enabled: bool) -> None:
+        """Enable or disable the results and undo buttons."""
+        self.query_one("#results-button").disabled = not enabled
+        self.query_one("#undo-button").disabled = not enabled
 
 
 if __name__ == "__main__":
-    # Initialize mimetypes
-    mimetypes.init()
-    
     # Run the application
     app = FileOrganizerPro()
     app.run()